@@ -2,20 +2,100 @@
 Extract financial news from NewsAPI
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 from dotenv import load_dotenv
 import os
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # Load environment variables
 load_dotenv()
 API_KEY = os.getenv('NEWS_API_KEY')
 
+# Shared HTTP session: keep-alive connections + retry/backoff on 429/5xx
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True
+    )
+))
+
+# Scalar article fields kept from the API response (source is flattened to source_name)
+ARTICLE_FIELDS = ['author', 'title', 'description', 'url', 'urlToImage', 'publishedAt', 'content']
+
+# Concurrency for multi-page fetches; batches are spaced to respect rate limits
+PAGE_WORKERS = 4
+PAGE_BATCH_INTERVAL = 1.0  # seconds between batches of page requests
+
+
+class NewsAPIError(requests.exceptions.RequestException):
+    """NewsAPI answered, but with an error status"""
+
+
+def fetch_page_with_total(url, params, page):
+    """
+    Fetch a single NewsAPI result page
+
+    Returns:
+        (list of articles, totalResults reported by the API)
+    """
+    response = SESSION.get(url, params={**params, 'page': page}, timeout=10)
+    response.raise_for_status()
+
+    data = response.json()
+    if data['status'] != 'ok':
+        raise NewsAPIError(data.get('message'))
+    return data['articles'], data.get('totalResults', 0)
+
+
+def fetch_page(url, params, page):
+    """Fetch a single NewsAPI result page and return its articles"""
+    return fetch_page_with_total(url, params, page)[0]
+
+
+def fetch_pages(url, params, pages):
+    """
+    Fetch several NewsAPI result pages concurrently
+
+    Pages are requested in batches of PAGE_WORKERS, with a pause between
+    batches. Failed pages are reported and skipped.
+
+    Returns:
+        list of articles, in page order
+    """
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        for start in range(0, len(pages), PAGE_WORKERS):
+            if start > 0:
+                time.sleep(PAGE_BATCH_INTERVAL)
+
+            batch = pages[start:start + PAGE_WORKERS]
+            futures = {page: executor.submit(fetch_page, url, params, page) for page in batch}
+
+            for page, future in futures.items():
+                try:
+                    results[page] = future.result()
+                except requests.exceptions.RequestException as e:
+                    print(f"⚠️  Page {page} failed: {e}")
+
+    return [article for page in sorted(results) for article in results[page]]
+
 
 def extract_financial_news(
         keywords=['stocks', 'market', 'finance', 'economy'],
         days_back=7,
-        page_size=100
+        page_size=100,
+        max_pages=1
 ):
     """
     Fetch financial news from NewsAPI
@@ -23,7 +103,8 @@ def extract_financial_news(
     Args:
         keywords: List of financial keywords to search
         days_back: How many days of history to fetch
-        page_size: Number of articles (max 100 for free tier)
+        page_size: Number of articles per page (max 100)
+        max_pages: Maximum number of result pages to fetch
 
     Returns:
         pandas DataFrame with articles
@@ -52,39 +133,42 @@ def extract_financial_news(
 
     try:
         print(f"   Making API request...")
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        articles, total_results = fetch_page_with_total(url, params, 1)
 
-        data = response.json()
+        # Fetch any further pages concurrently
+        total_pages = min(max_pages, math.ceil(total_results / page_size))
+        if total_pages > 1:
+            print(f"   Fetching {total_pages - 1} more pages...")
+            articles = articles + fetch_pages(url, params, list(range(2, total_pages + 1)))
 
-        if data['status'] == 'ok':
-            articles = data['articles']
+        # Convert to DataFrame column by column
+        columns = {field: [a.get(field) for a in articles] for field in ARTICLE_FIELDS}
 
-            # Convert to DataFrame
-            df = pd.DataFrame(articles)
+        # Extract source name from nested dict
+        columns['source_name'] = [
+            a['source'].get('name', 'Unknown') if isinstance(a.get('source'), dict) else 'Unknown'
+            for a in articles
+        ]
 
-            # Basic cleaning
-            if not df.empty:
-                # Extract source name from nested dict
-                df['source_name'] = df['source'].apply(
-                    lambda x: x.get('name', 'Unknown') if isinstance(x, dict) else 'Unknown'
-                )
+        df = pd.DataFrame(columns)
 
-                # Convert published date
-                df['publishedAt'] = pd.to_datetime(df['publishedAt'])
+        # Basic cleaning
+        if not df.empty:
+            # Convert published date (NewsAPI sends ISO 8601 strings)
+            df['publishedAt'] = pd.to_datetime(df['publishedAt'], utc=True, format='ISO8601')
 
-                # Add extraction timestamp
-                df['extracted_at'] = datetime.now()
+            # Add extraction timestamp
+            df['extracted_at'] = datetime.now()
 
-                print(f"✅ Successfully extracted {len(df)} articles")
-                return df
-            else:
-                print("⚠️  No articles found")
-                return pd.DataFrame()
+            print(f"✅ Successfully extracted {len(df)} articles")
+            return df
         else:
-            print(f"❌ API Error: {data.get('message')}")
+            print("⚠️  No articles found")
             return pd.DataFrame()
 
+    except NewsAPIError as e:
+        print(f"❌ API Error: {e}")
+        return pd.DataFrame()
     except requests.exceptions.RequestException as e:
         print(f"❌ Network error: {e}")
         return pd.DataFrame()
@@ -93,11 +177,11 @@ def extract_financial_news(
         return pd.DataFrame()
 
 
-def save_raw_data(df, filename='raw_news.csv'):
-    """Save raw data to CSV"""
+def save_raw_data(df, filename='raw_news.parquet'):
+    """Save raw data to Parquet"""
     if not df.empty:
         filepath = f'../data/{filename}'
-        df.to_csv(filepath, index=False)
+        df.to_parquet(filepath, engine='pyarrow', compression='zstd', index=False)
         print(f"💾 Saved to {filepath}")
         return filepath
     return None
@@ -3,16 +3,24 @@ Load data to DuckDB database
 """
 import pandas as pd
 import duckdb
-from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+import os
+import tempfile
 
 
-def load_to_duckdb(df, db_path='../data/financial_news.db'):
+def load_to_duckdb(df, db_path='../data/financial_news.db', conn=None):
     """
     Load enriched data into DuckDB
 
     Args:
         df: DataFrame with sentiment scores
         db_path: Path to DuckDB database
+        conn: Open DuckDB connection to reuse (opened from db_path if None)
+
+    Returns:
+        dict of load statistics (loaded_records, total_records,
+        avg_sentiment), or False if the load failed
     """
     print("\n💾 LOADING TO DATABASE")
     print("=" * 60)
@@ -24,104 +32,173 @@ def load_to_duckdb(df, db_path='../data/financial_news.db'):
     print(f"   Database: {db_path}")
     print(f"   Records to load: {len(df)}")
 
+    owns_conn = conn is None
+
     try:
-        # Connect to DuckDB
-        conn = duckdb.connect(db_path)
-
-        # Drop existing table to avoid schema conflicts
-        conn.execute("DROP TABLE IF EXISTS news_sentiment")
-
-        # Create table with exact columns we have
-        conn.execute("""
-            CREATE TABLE news_sentiment (
-                title VARCHAR,
-                description VARCHAR,
-                url VARCHAR,
-                source_name VARCHAR,
-                publishedAt TIMESTAMP,
-                date DATE,
-                hour INTEGER,
-                sentiment_compound DOUBLE,
-                sentiment_positive DOUBLE,
-                sentiment_negative DOUBLE,
-                sentiment_neutral DOUBLE,
-                sentiment_label VARCHAR,
-                extracted_at TIMESTAMP
-            )
-        """)
-
-        print("   ✅ Table 'news_sentiment' created")
-
-        # Prepare data
-        df_to_load = df.copy()
-
-        # Add extracted_at if missing
-        if 'extracted_at' not in df_to_load.columns:
-            df_to_load['extracted_at'] = datetime.now()
-
-        # Ensure date column is proper date type
-        if 'date' in df_to_load.columns:
-            df_to_load['date'] = pd.to_datetime(df_to_load['date']).dt.date
-
-        # Select columns in exact order matching table
-        columns = [
-            'title', 'description', 'url', 'source_name',
-            'publishedAt', 'date', 'hour',
-            'sentiment_compound', 'sentiment_positive', 'sentiment_negative',
-            'sentiment_neutral', 'sentiment_label', 'extracted_at'
-        ]
-
-        # Only use columns that exist
-        available_cols = [c for c in columns if c in df_to_load.columns]
-        df_to_load = df_to_load[available_cols]
-
-        print(f"   📋 Columns to insert: {len(available_cols)}")
-
-        # Insert data
-        conn.execute("INSERT INTO news_sentiment SELECT * FROM df_to_load")
-
-        # Get statistics
-        total_records = conn.execute("SELECT COUNT(*) FROM news_sentiment").fetchone()[0]
-
-        print(f"   ✅ Loaded {len(df_to_load)} records")
-        print(f"   📊 Total records in database: {total_records}")
-
-        # Show latest records
-        print(f"\n📰 Latest 5 Articles in Database:")
-        latest = conn.execute("""
-            SELECT 
-                title,
-                sentiment_label,
-                sentiment_compound,
-                date
-            FROM news_sentiment
-            ORDER BY publishedAt DESC
-            LIMIT 5
-        """).df()
-
-        if not latest.empty:
-            # Truncate long titles for display
-            latest['title'] = latest['title'].str[:50]
-            print(latest.to_string(index=False))
+        try:
+            # Connect to DuckDB unless the caller provided a connection
+            if owns_conn:
+                conn = duckdb.connect(db_path)
+
+            # Drop existing table to avoid schema conflicts
+            conn.execute("DROP TABLE IF EXISTS news_sentiment")
+
+            # Create table with exact columns we have
+            conn.execute("""
+                CREATE TABLE news_sentiment (
+                    title VARCHAR,
+                    description VARCHAR,
+                    url VARCHAR,
+                    source_name VARCHAR,
+                    publishedAt TIMESTAMP,
+                    date DATE,
+                    hour INTEGER,
+                    sentiment_compound DOUBLE,
+                    sentiment_positive DOUBLE,
+                    sentiment_negative DOUBLE,
+                    sentiment_neutral DOUBLE,
+                    sentiment_label VARCHAR,
+                    extracted_at TIMESTAMP DEFAULT current_timestamp
+                )
+            """)
+
+            print("   ✅ Table 'news_sentiment' created")
+
+            # Table columns; INSERT ... BY NAME matches them regardless of order,
+            # fills missing ones with their defaults (extracted_at -> now) and
+            # casts values such as date to the column types
+            columns = [
+                'title', 'description', 'url', 'source_name',
+                'publishedAt', 'date', 'hour',
+                'sentiment_compound', 'sentiment_positive', 'sentiment_negative',
+                'sentiment_neutral', 'sentiment_label', 'extracted_at'
+            ]
+
+            # The frame also carries non-table columns (content, day_of_week, ...);
+            # they are dropped while converting to Arrow, not by reindexing df
+            available_cols = [c for c in columns if c in df.columns]
+
+            print(f"   📋 Columns to insert: {len(available_cols)}")
+
+            # Store rows newest first so min/max zone maps can prune blocks
+            # for the ORDER BY publishedAt DESC queries
+            order_by = "ORDER BY publishedAt DESC" if 'publishedAt' in available_cols else ""
+
+            # Bulk load through a Parquet file so DuckDB uses its native reader
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                parquet_path = os.path.join(tmp_dir, 'load.parquet')
+                arrow_tbl = pa.Table.from_pandas(df, columns=available_cols, preserve_index=False)
+                pq.write_table(arrow_tbl, parquet_path, compression='zstd')
+                conn.execute(f"""
+                    INSERT INTO news_sentiment BY NAME
+                    SELECT * FROM read_parquet('{parquet_path}')
+                    {order_by}
+                """)
+
+            # Refresh optimizer statistics after the load
+            conn.execute("ANALYZE news_sentiment")
+
+            # Get statistics
+            total_records = conn.execute("SELECT COUNT(*) FROM news_sentiment").fetchone()[0]
+
+            print(f"   ✅ Loaded {len(df)} records")
+            print(f"   📊 Total records in database: {total_records}")
+
+        except Exception as e:
+            print(f"❌ Database error: {e}")
+            print(f"   Available columns in DataFrame: {list(df.columns)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        load_stats = {
+            'loaded_records': len(df),
+            'total_records': total_records,
+            'avg_sentiment': None
+        }
+
+        # Reporting only: a failure here does not undo a successful load
+        try:
+            load_stats['avg_sentiment'] = print_sentiment_summary(conn)
+            print_latest_articles(conn)
+        except Exception as e:
+            print(f"⚠️  Could not report on loaded data: {e}")
 
-        conn.close()
         print(f"\n✅ Database operation complete")
-        return True
+        return load_stats
 
-    except Exception as e:
-        print(f"❌ Database error: {e}")
-        print(f"   Available columns in DataFrame: {list(df.columns)}")
-        import traceback
-        traceback.print_exc()
-        return False
+    finally:
+        if owns_conn and conn is not None:
+            conn.close()
+
+
+def print_sentiment_summary(conn):
+    """
+    Print the sentiment distribution, aggregated in DuckDB
+
+    Returns:
+        average compound score (None if the table is empty)
+    """
+    distribution = conn.execute("""
+        SELECT
+            sentiment_label,
+            COUNT(*) AS count,
+            100.0 * COUNT(*) / SUM(COUNT(*)) OVER () AS percentage
+        FROM news_sentiment
+        GROUP BY sentiment_label
+        ORDER BY count DESC
+    """).fetchall()
+
+    print(f"\n📊 Sentiment Distribution:")
+    for label, count, percentage in distribution:
+        print(f"   {label.capitalize():10s}: {count:3d} ({percentage:5.1f}%)")
+
+    # Statistics
+    avg_sentiment = conn.execute("SELECT AVG(sentiment_compound) FROM news_sentiment").fetchone()[0]
+    if avg_sentiment is None:
+        return None
 
+    print(f"\n📈 Average Sentiment Score: {avg_sentiment:.3f}")
 
-def query_database(db_path='../data/financial_news.db', query=None):
-    """Query the database"""
+    if avg_sentiment >= 0.25:
+        print("   ➜ Overall: POSITIVE market sentiment")
+    elif avg_sentiment <= -0.25:
+        print("   ➜ Overall: NEGATIVE market sentiment")
+    else:
+        print("   ➜ Overall: NEUTRAL market sentiment")
+
+    return avg_sentiment
+
+
+def print_latest_articles(conn):
+    """Print the 5 most recently published articles in the database"""
+    print(f"\n📰 Latest 5 Articles in Database:")
+    latest = conn.execute("""
+        SELECT 
+            title,
+            sentiment_label,
+            sentiment_compound,
+            date
+        FROM news_sentiment
+        ORDER BY publishedAt DESC
+        LIMIT 5
+    """).df()
+
+    if not latest.empty:
+        # Truncate long titles for display
+        latest['title'] = latest['title'].str[:50]
+        print(latest.to_string(index=False))
+
+
+def query_database(db_path='../data/financial_news.db', query=None, conn=None):
+    """Query the database, reusing conn if one is provided"""
     if query is None:
         query = "SELECT COUNT(*) as total_articles FROM news_sentiment"
 
     try:
+        if conn is not None:
+            return conn.execute(query).df()
+
         conn = duckdb.connect(db_path, read_only=True)
         result = conn.execute(query).df()
         conn.close()
@@ -137,33 +214,39 @@ if __name__ == "__main__":
     print("TESTING DATABASE LOAD")
     print("=" * 60)
 
-    df = pd.read_csv('../data/news_with_sentiment.csv')
-
-    success = load_to_duckdb(df)
-
-    if success:
-        print("\n🔍 Database Statistics:")
-
-        # Total articles
-        stats = query_database(query="""
-            SELECT 
-                COUNT(*) as total_articles,
-                COUNT(DISTINCT date) as days_covered,
-                MIN(publishedAt) as oldest_article,
-                MAX(publishedAt) as newest_article
-            FROM news_sentiment
-        """)
-        print(stats.to_string(index=False))
-
-        # Sentiment breakdown
-        sentiment_dist = query_database(query="""
-            SELECT 
-                sentiment_label,
-                COUNT(*) as count,
-                ROUND(AVG(sentiment_compound), 3) as avg_score
-            FROM news_sentiment
-            GROUP BY sentiment_label
-            ORDER BY count DESC
-        """)
-        print("\n📊 Sentiment Distribution:")
-        print(sentiment_dist.to_string(index=False))
\ No newline at end of file
+    df = pd.read_parquet('../data/news_with_sentiment.parquet')
+
+    # One connection shared by the load and the statistics queries
+    conn = duckdb.connect('../data/financial_news.db')
+
+    try:
+        success = load_to_duckdb(df, conn=conn)
+
+        if success:
+            print("\n🔍 Database Statistics:")
+
+            # Total articles
+            stats = query_database(conn=conn, query="""
+                SELECT 
+                    COUNT(*) as total_articles,
+                    COUNT(DISTINCT date) as days_covered,
+                    MIN(publishedAt) as oldest_article,
+                    MAX(publishedAt) as newest_article
+                FROM news_sentiment
+            """)
+            print(stats.to_string(index=False))
+
+            # Sentiment breakdown
+            sentiment_dist = query_database(conn=conn, query="""
+                SELECT 
+                    sentiment_label,
+                    COUNT(*) as count,
+                    ROUND(AVG(sentiment_compound), 3) as avg_score
+                FROM news_sentiment
+                GROUP BY sentiment_label
+                ORDER BY count DESC
+            """)
+            print("\n📊 Sentiment Distribution:")
+            print(sentiment_dist.to_string(index=False))
+    finally:
+        conn.close()
@@ -6,10 +6,11 @@ from validate_data import validate_news_data, save_quality_report
 from transform_sentiment import add_sentiment_analysis, save_transformed_data
 from load_to_database import load_to_duckdb
 from datetime import datetime
+import duckdb
 import sys
 
 
-def run_full_pipeline(days_back=7, page_size=50):
+def run_full_pipeline(days_back=7, page_size=50, max_pages=1, db_path='../data/financial_news.db'):
     """Run complete ETL pipeline"""
 
     print("\n")
@@ -25,95 +26,119 @@ def run_full_pipeline(days_back=7, page_size=50):
         'overall_status': 'SUCCESS'
     }
 
-    # STEP 1: EXTRACT
-    print("\n" + "=" * 70)
-    print("📍 STEP 1/4: EXTRACT")
-    print("=" * 70)
+    # Database connection shared by the transform and load steps; opened
+    # lazily right before its first use so the write lock is not held
+    # during extraction and validation
+    conn = None
 
     try:
-        df_raw = extract_financial_news(days_back=days_back, page_size=page_size)
-
-        if df_raw.empty:
-            print("❌ PIPELINE FAILED: No data extracted")
+        # STEP 1: EXTRACT
+        print("\n" + "=" * 70)
+        print("📍 STEP 1/4: EXTRACT")
+        print("=" * 70)
+
+        try:
+            df_raw = extract_financial_news(
+                days_back=days_back, page_size=page_size, max_pages=max_pages
+            )
+
+            if df_raw.empty:
+                print("❌ PIPELINE FAILED: No data extracted")
+                pipeline_status['overall_status'] = 'FAILED'
+                pipeline_status['steps']['extract'] = 'FAILED - No data'
+                return pipeline_status
+
+            save_raw_data(df_raw)
+            pipeline_status['steps']['extract'] = f'SUCCESS - {len(df_raw)} articles'
+
+        except Exception as e:
+            print(f"❌ Extract failed: {e}")
             pipeline_status['overall_status'] = 'FAILED'
-            pipeline_status['steps']['extract'] = 'FAILED - No data'
+            pipeline_status['steps']['extract'] = f'FAILED - {str(e)}'
             return pipeline_status
 
-        save_raw_data(df_raw)
-        pipeline_status['steps']['extract'] = f'SUCCESS - {len(df_raw)} articles'
+        # STEP 2: VALIDATE
+        print("\n" + "=" * 70)
+        print("📍 STEP 2/4: VALIDATE")
+        print("=" * 70)
 
-    except Exception as e:
-        print(f"❌ Extract failed: {e}")
-        pipeline_status['overall_status'] = 'FAILED'
-        pipeline_status['steps']['extract'] = f'FAILED - {str(e)}'
-        return pipeline_status
+        try:
+            df_clean, quality_report = validate_news_data(df_raw)
 
-    # STEP 2: VALIDATE
-    print("\n" + "=" * 70)
-    print("📍 STEP 2/4: VALIDATE")
-    print("=" * 70)
+            if df_clean.empty:
+                print("❌ PIPELINE FAILED: No clean data after validation")
+                pipeline_status['overall_status'] = 'FAILED'
+                pipeline_status['steps']['validate'] = 'FAILED - No clean data'
+                return pipeline_status
 
-    try:
-        df_clean, quality_report = validate_news_data(df_raw)
+            save_quality_report(quality_report)
+            pipeline_status['steps']['validate'] = f'SUCCESS - {len(df_clean)} clean records'
 
-        if df_clean.empty:
-            print("❌ PIPELINE FAILED: No clean data after validation")
+        except Exception as e:
+            print(f"❌ Validation failed: {e}")
             pipeline_status['overall_status'] = 'FAILED'
-            pipeline_status['steps']['validate'] = 'FAILED - No clean data'
+            pipeline_status['steps']['validate'] = f'FAILED - {str(e)}'
             return pipeline_status
 
-        save_quality_report(quality_report)
-        pipeline_status['steps']['validate'] = f'SUCCESS - {len(df_clean)} clean records'
+        # STEP 3: TRANSFORM
+        print("\n" + "=" * 70)
+        print("📍 STEP 3/4: TRANSFORM (Sentiment Analysis)")
+        print("=" * 70)
 
-    except Exception as e:
-        print(f"❌ Validation failed: {e}")
-        pipeline_status['overall_status'] = 'FAILED'
-        pipeline_status['steps']['validate'] = f'FAILED - {str(e)}'
-        return pipeline_status
+        # The connection only serves the score cache here; without it the
+        # transform scores every article and the load step retries the open
+        try:
+            conn = duckdb.connect(db_path)
+        except Exception as e:
+            print(f"⚠️  Database unavailable, scoring without cache: {e}")
 
-    # STEP 3: TRANSFORM
-    print("\n" + "=" * 70)
-    print("📍 STEP 3/4: TRANSFORM (Sentiment Analysis)")
-    print("=" * 70)
+        try:
+            df_final = add_sentiment_analysis(df_clean, conn=conn)
 
-    try:
-        df_final = add_sentiment_analysis(df_clean)
+            if df_final.empty:
+                print("❌ PIPELINE FAILED: Transformation failed")
+                pipeline_status['overall_status'] = 'FAILED'
+                pipeline_status['steps']['transform'] = 'FAILED'
+                return pipeline_status
 
-        if df_final.empty:
-            print("❌ PIPELINE FAILED: Transformation failed")
+            save_transformed_data(df_final)
+            pipeline_status['steps']['transform'] = f'SUCCESS - {len(df_final)} articles scored'
+
+        except Exception as e:
+            print(f"❌ Transformation failed: {e}")
             pipeline_status['overall_status'] = 'FAILED'
-            pipeline_status['steps']['transform'] = 'FAILED'
+            pipeline_status['steps']['transform'] = f'FAILED - {str(e)}'
             return pipeline_status
 
-        save_transformed_data(df_final)
-        avg_sentiment = df_final['sentiment_compound'].mean()
-        pipeline_status['steps']['transform'] = f'SUCCESS - Avg sentiment: {avg_sentiment:.3f}'
-
-    except Exception as e:
-        print(f"❌ Transformation failed: {e}")
-        pipeline_status['overall_status'] = 'FAILED'
-        pipeline_status['steps']['transform'] = f'FAILED - {str(e)}'
-        return pipeline_status
-
-    # STEP 4: LOAD
-    print("\n" + "=" * 70)
-    print("📍 STEP 4/4: LOAD TO DATABASE")
-    print("=" * 70)
-
-    try:
-        success = load_to_duckdb(df_final)
-
-        if not success:
-            print("❌ PIPELINE FAILED: Load to database failed")
+        # STEP 4: LOAD
+        print("\n" + "=" * 70)
+        print("📍 STEP 4/4: LOAD TO DATABASE")
+        print("=" * 70)
+
+        try:
+            if conn is None:
+                conn = duckdb.connect(db_path)
+
+            load_stats = load_to_duckdb(df_final, db_path=db_path, conn=conn)
+
+            if not load_stats:
+                print("❌ PIPELINE FAILED: Load to database failed")
+                pipeline_status['overall_status'] = 'WARNING'
+                pipeline_status['steps']['load'] = 'FAILED'
+            else:
+                avg_sentiment = load_stats['avg_sentiment']
+                avg_text = f'{avg_sentiment:.3f}' if avg_sentiment is not None else 'n/a'
+                pipeline_status['steps']['load'] = (
+                    f'SUCCESS - {len(df_final)} records loaded, avg sentiment: {avg_text}'
+                )
+
+        except Exception as e:
+            print(f"❌ Load failed: {e}")
             pipeline_status['overall_status'] = 'WARNING'
-            pipeline_status['steps']['load'] = 'FAILED'
-        else:
-            pipeline_status['steps']['load'] = f'SUCCESS - {len(df_final)} records loaded'
-
-    except Exception as e:
-        print(f"❌ Load failed: {e}")
-        pipeline_status['overall_status'] = 'WARNING'
-        pipeline_status['steps']['load'] = f'FAILED - {str(e)}'
+            pipeline_status['steps']['load'] = f'FAILED - {str(e)}'
+    finally:
+        if conn is not None:
+            conn.close()
 
     # PIPELINE SUMMARY
     pipeline_status['end_time'] = datetime.now()
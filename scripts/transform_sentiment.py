@@ -1,17 +1,101 @@
 """
 Transform: Add sentiment analysis
 """
+import numpy as np
 import pandas as pd
+import duckdb
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import multiprocessing
+import os
 
+# VADER analyzer, created once per process (the lexicon is parsed on creation)
+_ANALYZER = None
 
-def add_sentiment_analysis(df):
+# Below this many articles a process pool costs more than it saves
+PARALLEL_MIN_ARTICLES = 1000
+PARALLEL_MAX_WORKERS = 4
+
+# Sentiment columns and the VADER score each one holds
+SCORE_COLUMNS = {
+    'sentiment_compound': 'compound',  # -1 to +1
+    'sentiment_positive': 'pos',  # 0 to 1
+    'sentiment_negative': 'neg',  # 0 to 1
+    'sentiment_neutral': 'neu'  # 0 to 1
+}
+
+
+def _init_analyzer():
+    """Create the cached VADER analyzer if this process has none yet"""
+    global _ANALYZER
+    if _ANALYZER is None:
+        _ANALYZER = SentimentIntensityAnalyzer()
+    return _ANALYZER
+
+
+def score_text(text):
+    """VADER polarity scores for a single text"""
+    return _init_analyzer().polarity_scores(text)
+
+
+def score_texts(texts):
+    """
+    VADER polarity scores for a list of texts
+
+    Large batches are spread over a process pool, since VADER is pure
+    Python and holds the GIL. Single-CPU machines always score serially.
+    """
+    cpu_count = os.cpu_count() or 1
+    if len(texts) >= PARALLEL_MIN_ARTICLES and cpu_count > 1:
+        # Spawn rather than fork: the caller may already run DuckDB threads,
+        # and forking a multi-threaded process can deadlock
+        with ProcessPoolExecutor(
+                max_workers=min(cpu_count, PARALLEL_MAX_WORKERS),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_analyzer
+        ) as executor:
+            return list(executor.map(score_text, texts, chunksize=64))
+    analyzer = _init_analyzer()
+    return [analyzer.polarity_scores(text) for text in texts]
+
+
+def fetch_cached_scores(conn, urls):
+    """
+    Sentiment scores already stored in DuckDB for the given article URLs
+
+    Args:
+        conn: Open DuckDB connection
+        urls: Series of article URLs
+
+    Returns:
+        DataFrame of score columns indexed by url (empty if nothing is stored)
+    """
+    conn.register('scored_urls', pd.DataFrame({'url': urls.dropna().unique()}))
+
+    try:
+        cached = conn.execute(f"""
+            SELECT DISTINCT ON (url) url, {', '.join(SCORE_COLUMNS)}
+            FROM news_sentiment
+            WHERE url IN (SELECT url FROM scored_urls)
+        """).df()
+    except duckdb.CatalogException:
+        # First run: the table does not exist yet
+        cached = pd.DataFrame(columns=['url', *SCORE_COLUMNS])
+    finally:
+        conn.unregister('scored_urls')
+
+    return cached.set_index('url')
+
+
+def add_sentiment_analysis(df, conn=None):
     """
     Add sentiment scores to articles
 
     Args:
         df: Clean news DataFrame
+        conn: Open DuckDB connection; if given, articles whose url is
+            already in news_sentiment reuse the stored scores
 
     Returns:
         DataFrame with sentiment columns
@@ -23,80 +107,75 @@ def add_sentiment_analysis(df):
         print("❌ DataFrame is empty!")
         return df
 
-    # Initialize VADER
-    analyzer = SentimentIntensityAnalyzer()
+    # Reuse scores from a previous run for articles already in the database
+    scores = pd.DataFrame(np.nan, index=df.index, columns=list(SCORE_COLUMNS))
+    if conn is not None and 'url' in df.columns:
+        cached = fetch_cached_scores(conn, df['url'])
+        for column in SCORE_COLUMNS:
+            scores[column] = df['url'].map(cached[column]).astype(float)
+
+    to_score = scores['sentiment_compound'].isna().to_numpy()
+    cached_count = len(df) - int(to_score.sum())
 
     print(f"   Analyzing {len(df)} articles...")
+    if cached_count > 0:
+        print(f"   ♻️  Reusing stored scores for {cached_count} articles")
+
+    if to_score.any():
+        df_to_score = df.loc[to_score]
 
-    # Function to analyze single article
-    def analyze_article(row):
         # Combine title + description for better analysis
-        text = str(row.get('title', '')) + ' ' + str(row.get('description', ''))
+        texts = (
+            df_to_score['title'].fillna('').astype(str) + ' '
+            + df_to_score['description'].fillna('').astype(str)
+        ).tolist()
 
         # Get sentiment scores
-        scores = analyzer.polarity_scores(text)
-
-        return pd.Series({
-            'sentiment_compound': scores['compound'],  # -1 to +1
-            'sentiment_positive': scores['pos'],  # 0 to 1
-            'sentiment_negative': scores['neg'],  # 0 to 1
-            'sentiment_neutral': scores['neu']  # 0 to 1
-        })
-
-    # Apply sentiment analysis
-    sentiment_df = df.apply(analyze_article, axis=1)
-
-    # Combine with original data
-    df_with_sentiment = pd.concat([df, sentiment_df], axis=1)
-
-    # Categorize sentiment
-    def categorize_sentiment(compound_score):
-        if compound_score >= 0.05:
-            return 'positive'
-        elif compound_score <= -0.05:
-            return 'negative'
-        else:
-            return 'neutral'
-
-    df_with_sentiment['sentiment_label'] = df_with_sentiment['sentiment_compound'].apply(
-        categorize_sentiment
+        new_scores = score_texts(texts)
+
+        scores.loc[to_score, list(SCORE_COLUMNS)] = np.array(
+            [[s[key] for key in SCORE_COLUMNS.values()] for s in new_scores]
+        )
+
+    compound = scores['sentiment_compound'].to_numpy()
+
+    df_with_sentiment = df.assign(
+        **{column: scores[column].to_numpy() for column in SCORE_COLUMNS},
+        # Categorize sentiment
+        sentiment_label=np.select(
+            [compound >= 0.05, compound <= -0.05],
+            ['positive', 'negative'],
+            default='neutral'
+        )
     )
 
     # Add date features for analysis
     if 'publishedAt' in df_with_sentiment.columns:
-        df_with_sentiment['publishedAt'] = pd.to_datetime(df_with_sentiment['publishedAt'])
-        df_with_sentiment['date'] = df_with_sentiment['publishedAt'].dt.date
-        df_with_sentiment['hour'] = df_with_sentiment['publishedAt'].dt.hour
-        df_with_sentiment['day_of_week'] = df_with_sentiment['publishedAt'].dt.day_name()
-
-    # Show distribution
-    print(f"\n📊 Sentiment Distribution:")
-    sentiment_counts = df_with_sentiment['sentiment_label'].value_counts()
-    for label, count in sentiment_counts.items():
-        percentage = (count / len(df_with_sentiment)) * 100
-        print(f"   {label.capitalize():10s}: {count:3d} ({percentage:5.1f}%)")
-
-    # Statistics
-    avg_sentiment = df_with_sentiment['sentiment_compound'].mean()
-    print(f"\n📈 Average Sentiment Score: {avg_sentiment:.3f}")
-
-    if avg_sentiment >= 0.25:
-        print("   ➜ Overall: POSITIVE market sentiment")
-    elif avg_sentiment <= -0.25:
-        print("   ➜ Overall: NEGATIVE market sentiment")
-    else:
-        print("   ➜ Overall: NEUTRAL market sentiment")
+        published = df_with_sentiment['publishedAt']
+
+        # Parquet hand-offs keep the datetime dtype; only parse text input
+        if not pd.api.types.is_datetime64_any_dtype(published):
+            published = pd.to_datetime(published, utc=True, format='ISO8601')
+
+        dt = published.dt
+        df_with_sentiment = df_with_sentiment.assign(
+            publishedAt=published,
+            date=dt.date,
+            hour=dt.hour.astype('int16'),  # 0-23 fits in int16
+            day_of_week=dt.day_name()
+        )
 
+    # Distribution and averages are computed in DuckDB after loading
     print(f"\n✅ Sentiment analysis complete")
 
     return df_with_sentiment
 
 
-def save_transformed_data(df, filename='news_with_sentiment.csv'):
-    """Save transformed data"""
+def save_transformed_data(df, filename='news_with_sentiment.parquet'):
+    """Save transformed data to Parquet"""
     if not df.empty:
         filepath = f'../data/{filename}'
-        df.to_csv(filepath, index=False)
+        df.to_parquet(filepath, engine='pyarrow', compression='zstd', index=False)
         print(f"💾 Saved to {filepath}")
         return filepath
     return None
@@ -108,7 +187,7 @@ if __name__ == "__main__":
     print("TESTING SENTIMENT TRANSFORMATION")
     print("=" * 60)
 
-    df_clean = pd.read_csv('../data/clean_news.csv')
+    df_clean = pd.read_parquet('../data/clean_news.parquet')
 
     df_final = add_sentiment_analysis(df_clean)
 